@@ -0,0 +1,108 @@
+"""
+Caching of formatting results, so that Snakefiles already seen with the same
+configuration are not parsed and formatted again
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Sequence, Tuple
+
+import black
+from black import Mode
+
+from snakefmt import __version__
+from snakefmt.config import PathLike
+
+CACHE_DIR_ENV_VAR = "SNAKEFMT_CACHE_DIR"
+CACHE_FILE_NAME = "cache.pickle"
+
+
+def get_cache_dir() -> Path:
+    """
+    Defaults to the snakefmt directory of the user's cache (XDG_CACHE_HOME or
+    ~/.cache), unless overridden by the SNAKEFMT_CACHE_DIR environment variable.
+    Each snakefmt version gets its own subdirectory.
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV_VAR)
+    if cache_dir is None:
+        cache_root = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        cache_dir = Path(cache_root) / "snakefmt"
+    return Path(cache_dir) / __version__
+
+
+def compute_key(content: str, black_mode: Mode) -> str:
+    """
+    The black mode holds the line length, so all formatting options are keyed. Black
+    produces most of the output, so its version is keyed alongside snakefmt's.
+    """
+    hasher = hashlib.sha256()
+    for part in (content, repr(black_mode), __version__, black.__version__):
+        hasher.update(part.encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class CacheEntry(NamedTuple):
+    key: str
+    formatted: str
+    # Logged while formatting, to be logged again when the entry is used
+    warnings: Tuple[str, ...] = ()
+
+
+class Cache:
+    """
+    Maps each formatted file to its latest :compute_key: key, formatted content and
+    formatting warnings, persisted with pickle. Holding one entry per file path
+    bounds the cache by the number of files formatted, rather than by the number of
+    edits made to them.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None):
+        if cache_file is None:
+            cache_file = get_cache_dir() / CACHE_FILE_NAME
+        self.cache_file = cache_file
+        self.modified = False
+        self.entries = self.read()
+
+    def read(self) -> Dict[str, CacheEntry]:
+        try:
+            with self.cache_file.open("rb") as fin:
+                entries = pickle.load(fin)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, IndexError):
+            return dict()
+        return entries if isinstance(entries, dict) else dict()
+
+    @staticmethod
+    def path_key(path: PathLike) -> str:
+        return str(Path(path).resolve())
+
+    def get(self, path: PathLike, key: str) -> Optional[CacheEntry]:
+        """The entry for `path`, if it was cached under `key`"""
+        entry = self.entries.get(self.path_key(path))
+        if not isinstance(entry, CacheEntry) or entry.key != key:
+            return None
+        return entry
+
+    def put(
+        self, path: PathLike, key: str, formatted: str, warnings: Sequence[str] = ()
+    ) -> None:
+        """Replaces any previous entry for `path`"""
+        self.entries[self.path_key(path)] = CacheEntry(key, formatted, tuple(warnings))
+        self.modified = True
+
+    def write(self) -> None:
+        """Atomically replaces the cache file, if any entry was added"""
+        if not self.modified:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                dir=str(self.cache_file.parent), delete=False
+            ) as fout:
+                pickle.dump(self.entries, fout, protocol=4)
+            os.replace(fout.name, self.cache_file)
+        except OSError:
+            pass
+        self.modified = False
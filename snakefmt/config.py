@@ -2,12 +2,15 @@
 Code for searching for and parsing snakefmt configuration files
 """
 
+import os
+import sys
+from copy import copy
 from dataclasses import fields
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Sequence, Union
+from typing import Any, Dict, Optional, Sequence, Union
 
 import click
-import toml
 from black import Mode, find_project_root
 
 from snakefmt import DEFAULT_LINE_LENGTH
@@ -15,6 +18,24 @@ from snakefmt.exceptions import MalformattedToml
 
 PathLike = Union[Path, str]
 
+# From Python 3.11, the standard library ships the (faster) tomllib parser
+if sys.version_info >= (3, 11):
+    import tomllib
+
+    TomlDecodeError = tomllib.TOMLDecodeError
+
+    def load_toml(path: PathLike) -> Dict[str, Any]:
+        with open(path, "rb") as toml_file:
+            return tomllib.load(toml_file)
+
+else:
+    import toml
+
+    TomlDecodeError = toml.TomlDecodeError
+
+    def load_toml(path: PathLike) -> Dict[str, Any]:
+        return toml.load(path)
+
 
 def find_pyproject_toml(start_path: Sequence[str]) -> Optional[str]:
     root, _ = find_project_root(start_path)
@@ -27,11 +48,11 @@ def read_snakefmt_config(path: Optional[str]) -> Dict[str, str]:
     if path is None:
         return dict()
     try:
-        config_toml = toml.load(path)
+        config_toml = load_toml(path)
         config = config_toml.get("tool", {}).get("snakefmt", {})
         config = {k.replace("--", "").replace("-", "_"): v for k, v in config.items()}
         return config
-    except (toml.TomlDecodeError, OSError) as error:
+    except (TomlDecodeError, OSError) as error:
         raise click.FileError(
             filename=path, hint=f"Error reading configuration file: {error}"
         )
@@ -64,9 +85,9 @@ def read_black_config(path: Optional[PathLike]) -> Mode:
         raise FileNotFoundError(f"{path} is not a file.")
 
     try:
-        pyproject_toml = toml.load(path)
+        pyproject_toml = load_toml(path)
         config = pyproject_toml.get("tool", {}).get("black", {})
-    except toml.TomlDecodeError as error:
+    except TomlDecodeError as error:
         raise MalformattedToml(error)
 
     valid_black_filemode_params = sorted([field.name for field in fields(Mode)])
@@ -84,3 +105,30 @@ def read_black_config(path: Optional[PathLike]) -> Mode:
 
         setattr(black_mode, key, val)
     return black_mode
+
+
+@lru_cache(maxsize=32)
+def _cached_black_mode(
+    path: Optional[str], mtime: Optional[float], line_length: Optional[int]
+) -> Mode:
+    black_mode = read_black_config(path)
+    if line_length is not None:
+        black_mode.line_length = line_length
+    return black_mode
+
+
+def make_black_mode(
+    path: Optional[PathLike], line_length: Optional[int] = None
+) -> Mode:
+    """
+    Builds the Black mode from the provided toml and line length override.
+    Modes are cached per (file, modification time, line length) so that formatting
+    many files with the same configuration only parses it once.
+    """
+    mtime = None
+    if path is not None:
+        path = str(Path(path).resolve())
+        if os.path.isfile(path):
+            mtime = os.path.getmtime(path)
+    # Copy so callers can't alter the cached mode
+    return copy(_cached_black_mode(path, mtime, line_length))
@@ -0,0 +1,150 @@
+"""
+A formatting server that keeps snakefmt (and black) loaded between requests, so
+that formatting a file does not pay the interpreter start-up and import costs.
+Modelled on blackd: POST the Snakefile content, get the formatted content back.
+"""
+import logging
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from typing import Optional
+
+import click
+
+from snakefmt import __version__
+from snakefmt.config import PathLike
+from snakefmt.formatter import Formatter
+from snakefmt.logging import LogConfig
+from snakefmt.parser.parser import Snakefile
+
+DEFAULT_HOST = "localhost"
+DEFAULT_PORT = 45484
+LINE_LENGTH_HEADER = "X-Line-Length"
+VERSION_HEADER = "X-Snakefmt-Version"
+
+
+class SnakefmtServer(ThreadingHTTPServer):
+    """
+    Holds the black configuration file given at start-up: clients cannot choose
+    which files on the server get read
+    """
+
+    def __init__(self, address, black_config: Optional[PathLike] = None):
+        super().__init__(address, SnakefmtRequestHandler)
+        self.black_config = black_config
+
+
+class SnakefmtRequestHandler(BaseHTTPRequestHandler):
+    """
+    Formats the Snakefile sent as the body of a POST request.
+    Responds 200 with the formatted content, 204 if it is already formatted,
+    and 400 with the error message if it could not be formatted.
+    """
+
+    def do_POST(self) -> None:
+        line_length: Optional[int] = None
+        if self.headers.get(LINE_LENGTH_HEADER) is not None:
+            try:
+                line_length = int(self.headers[LINE_LENGTH_HEADER])
+            except ValueError:
+                self.respond(HTTPStatus.BAD_REQUEST, "Invalid line length header")
+                return
+
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            content_length = -1
+        # A negative length would read until the client closes the connection
+        if content_length < 0:
+            self.respond(HTTPStatus.BAD_REQUEST, "Invalid Content-Length header")
+            return
+        try:
+            original_content = self.rfile.read(content_length).decode("utf-8")
+        except UnicodeDecodeError:
+            self.respond(HTTPStatus.BAD_REQUEST, "Request body is not valid UTF-8")
+            return
+
+        try:
+            snakefile = Snakefile(StringIO(original_content))
+            formatter = Formatter(
+                snakefile,
+                line_length=line_length,
+                black_config_file=self.server.black_config,
+            )
+            formatted_content = formatter.get_formatted()
+        except Exception as error:
+            self.respond(HTTPStatus.BAD_REQUEST, f"{error.__class__.__name__}: {error}")
+            return
+
+        if formatted_content == original_content:
+            self.respond(HTTPStatus.NO_CONTENT)
+        else:
+            self.respond(HTTPStatus.OK, formatted_content)
+
+    def respond(self, status: HTTPStatus, body: str = "") -> None:
+        encoded = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header(VERSION_HEADER, __version__)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format: str, *args) -> None:
+        LogConfig.get_logger().debug(format % args)
+
+
+def make_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    black_config: Optional[PathLike] = None,
+) -> SnakefmtServer:
+    return SnakefmtServer((host, port), black_config)
+
+
+@click.command()
+@click.option(
+    "--bind-host",
+    type=str,
+    default=DEFAULT_HOST,
+    show_default=True,
+    help="Address to bind the server to.",
+)
+@click.option(
+    "--bind-port",
+    type=int,
+    default=DEFAULT_PORT,
+    show_default=True,
+    help="Port to listen on.",
+)
+@click.option(
+    "--config",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    metavar="PATH",
+    help="Read black configuration from PATH for all requests.",
+)
+@click.help_option("--help", "-h")
+@click.version_option(__version__, "--version", "-V")
+@click.option("-v", "--verbose", help="Turns on debug-level logger.", is_flag=True)
+def main(bind_host: str, bind_port: int, config: Optional[str], verbose: bool):
+    """Serve snakefmt over HTTP.
+
+    POST a Snakefile to the server to receive its formatted content. The line length
+    can be given in the X-Line-Length header.
+    """
+    log_level = logging.DEBUG if verbose else logging.INFO
+    LogConfig.init(log_level)
+    logger = LogConfig.get_logger()
+
+    server = make_server(bind_host, bind_port, config)
+    logger.info(f"snakefmtd version {__version__} listening on {bind_host}:{bind_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,24 +2,16 @@ import re
 import textwrap
 from ast import parse as ast_parse
 from copy import copy
-from typing import Optional
+from io import StringIO
+from typing import Dict, List, Optional, Tuple
 
 import black
 
-from snakefmt.config import PathLike, read_black_config
+from snakefmt.config import PathLike, make_black_mode
 from snakefmt.exceptions import InvalidParameterSyntax, InvalidPython
 from snakefmt.logging import Warnings
 from snakefmt.parser.parser import Parser, comment_start
-from snakefmt.parser.syntax import (
-    COMMENT_SPACING,
-    TAB,
-    InlineSingleParam,
-    Parameter,
-    ParameterSyntax,
-    ParamList,
-    SingleParam,
-    Syntax,
-)
+from snakefmt.parser.syntax import COMMENT_SPACING, TAB, Parameter, ParameterSyntax
 from snakefmt.types import TokenIterator
 
 # This regex matches any number of consecutive strings; each can span multiple lines.
@@ -29,6 +21,40 @@ full_string_matcher = re.compile(
 contextual_matcher = re.compile(
     r"(.*)^(if|elif|else|with|for|while)([^:]*)(:.*)", re.S | re.M
 )
+black_error_matcher = re.compile(r"(Cannot parse: )(?P<line>\d+)(.*)")
+
+_indent_cache: List[str] = [""]
+
+
+def indent_str(level: int) -> str:
+    """Returns the indentation string for `level` levels, building each once"""
+    if level <= 0:
+        return ""
+    while len(_indent_cache) <= level:
+        _indent_cache.append(_indent_cache[-1] + TAB)
+    return _indent_cache[level]
+
+
+def indent_lines(text: str, level: int) -> str:
+    """textwrap.indent by `level` levels, skipped when there is nothing to add"""
+    if level <= 0 or text == "":
+        return text
+    return textwrap.indent(text, indent_str(level))
+
+
+def dedent_lines(text: str) -> str:
+    """
+    textwrap.dedent in a single pass over the lines, for tab-free text such as the
+    (tab-expanded) strings in :align_strings:
+    """
+    if "\t" in text:
+        return textwrap.dedent(text)
+    lines = text.split("\n")
+    margin = min(
+        (len(line) - len(line.lstrip(" ")) for line in lines if line.strip(" ")),
+        default=0,
+    )
+    return "\n".join(line[margin:] if line.strip(" ") else "" for line in lines)
 
 
 class Formatter(Parser):
@@ -38,19 +64,18 @@ class Formatter(Parser):
         line_length: Optional[int] = None,
         black_config_file: Optional[PathLike] = None,
     ):
-        self.result: str = ""
+        self.result = StringIO()
         self.lagging_comments: str = ""
         self.no_formatting_yet: bool = True
+        # black output memoised by (input code, effective line length)
+        self._black_cache: Dict[Tuple[str, int], str] = {}
 
-        self.black_mode = read_black_config(black_config_file)
-
-        if line_length is not None:
-            self.black_mode.line_length = line_length
+        self.black_mode = make_black_mode(black_config_file, line_length)
 
         super().__init__(snakefile)  # Call to parse snakefile
 
     def get_formatted(self) -> str:
-        return self.result
+        return self.result.getvalue()
 
     def flush_buffer(
         self,
@@ -58,8 +83,9 @@ class Formatter(Parser):
         final_flush: bool = False,
         in_global_context: bool = False,
     ) -> None:
-        if len(self.buffer) == 0 or self.buffer.isspace():
-            self.result += self.buffer
+        buffer = self.buffer
+        if not buffer or (buffer[0].isspace() and buffer.isspace()):
+            self.result.write(buffer)
             self.buffer = ""
             return
 
@@ -98,7 +124,7 @@ class Formatter(Parser):
 
             code_indent = self.syntax.code_indent
             if code_indent is not None:
-                formatted = textwrap.indent(formatted, f"{TAB * code_indent}")
+                formatted = indent_lines(formatted, code_indent)
                 if self.syntax.effective_indent == 0:
                     self.syntax.code_indent = 0
 
@@ -113,25 +139,25 @@ class Formatter(Parser):
         self.add_newlines(self.target_indent, formatted, final_flush, in_global_context)
         self.buffer = ""
 
-    def process_keyword_context(self, in_global_context: bool):
+    def process_keyword_context(self, in_global_context: bool) -> None:
         cur_indent = self.syntax.cur_indent
         self.add_newlines(cur_indent, in_global_context=in_global_context)
-        formatted = f"{TAB * cur_indent}{self.syntax.keyword_line}"
+        formatted = f"{indent_str(cur_indent)}{self.syntax.keyword_line}"
         if self.syntax.enter_context:
             formatted += ":"
         formatted += f"{self.syntax.comment}\n"
-        self.result += formatted
+        self.result.write(formatted)
         self.last_recognised_keyword = self.syntax.keyword_name
 
     def process_keyword_param(
         self, param_context: ParameterSyntax, in_global_context: bool
-    ):
+    ) -> None:
         self.add_newlines(
             param_context.target_indent - 1,
             in_global_context=in_global_context,
             context=param_context,
         )
-        self.result += self.format_params(param_context)
+        self.result.write(self.format_params(param_context))
         self.last_recognised_keyword = param_context.keyword_name
 
     def run_black_format_str(
@@ -146,26 +172,32 @@ class Formatter(Parser):
         # this checks if we are inside snakecode, within a nested if-else statement
         if inside_nested_statement and self.from_python and self.in_global_context:
             # indent any comments and the first line
+            code_indent = indent_str(self.syntax.code_indent)
             tmpstring = ""
             for i, line in enumerate(string.splitlines(keepends=True)):
                 if comment_start(line) or i == 0:
-                    line = f"{TAB * self.syntax.code_indent}{line}"
+                    line = f"{code_indent}{line}"
                 tmpstring += line
             string = textwrap.dedent(tmpstring)
 
         # reduce black target line length according to how indented the code is
         current_line_length = target_indent * len(TAB)
-        black_mode = copy(self.black_mode)
-        black_mode.line_length = max(
-            0, black_mode.line_length - current_line_length + extra_spacing
+        line_length = max(
+            0, self.black_mode.line_length - current_line_length + extra_spacing
         )
+        cache_key = (string, line_length)
+        cached = self._black_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        black_mode = copy(self.black_mode)
+        black_mode.line_length = line_length
         try:
             fmted = black.format_str(string, mode=black_mode)
         except black.InvalidInput as e:
             err_msg = ""
             # Not clear whether all Black errors start with 'Cannot parse' - it seems to
             # in the tests I ran
-            match = re.search(r"(Cannot parse: )(?P<line>\d+)(.*)", str(e))
+            match = black_error_matcher.search(str(e))
             try:
                 next_token = next(self.snakefile)
                 self.snakefile.denext(next_token)
@@ -185,31 +217,34 @@ class Formatter(Parser):
                 )
             err_msg = f"Black error:\n```\n{str(err_msg)}\n```\n"
             raise InvalidPython(err_msg) from None
+        self._black_cache[cache_key] = fmted
         return fmted
 
     def align_strings(self, string: str, target_indent: int) -> str:
         """
         Takes an ensemble of strings and indents/reindents it
         """
+        if '"' not in string and "'" not in string:
+            # No strings to realign: plain indentation suffices
+            return indent_lines(string, target_indent)
         pos = 0
-        used_indent = TAB * target_indent
         indented = ""
-        for match in re.finditer(full_string_matcher, string):
-            indented += textwrap.indent(string[pos : match.start(1)], used_indent)
+        for match in full_string_matcher.finditer(string):
+            indented += indent_lines(string[pos : match.start(1)], target_indent)
             match_slice = string[match.start(1) : match.end(1)].replace("\t", TAB)
             all_lines = match_slice.splitlines(keepends=True)
-            first = textwrap.indent(textwrap.dedent(all_lines[0]), used_indent)
+            first = indent_lines(dedent_lines(all_lines[0]), target_indent)
             indented += first
             if len(all_lines) > 2:
-                middle = textwrap.indent(
-                    textwrap.dedent("".join(all_lines[1:-1])), used_indent
+                middle = indent_lines(
+                    dedent_lines("".join(all_lines[1:-1])), target_indent
                 )
                 indented += middle
             if len(all_lines) > 1:
-                last = textwrap.indent(textwrap.dedent(all_lines[-1]), used_indent)
+                last = indent_lines(dedent_lines(all_lines[-1]), target_indent)
                 indented += last
             pos = match.end()
-        indented += textwrap.indent(string[pos:], used_indent)
+        indented += indent_lines(string[pos:], target_indent)
 
         return indented
 
@@ -220,7 +255,7 @@ class Formatter(Parser):
         inline_formatting: bool,
         param_list: bool = True,
     ) -> str:
-        string_indent = TAB * target_indent
+        string_indent = indent_str(target_indent)
         if inline_formatting:
             target_indent = 0
         val = str(parameter)
@@ -241,40 +276,36 @@ class Formatter(Parser):
             extra_spacing = 3
         val = self.run_black_format_str(val, target_indent, extra_spacing)
         if param_list:
-            match_equal = re.match(r"f\((.*)\)", val, re.DOTALL)
-            val = match_equal.group(1)
-            val = textwrap.dedent(val)
+            # Unwrap the parameters from the dummy 'f(...)' call
+            val = textwrap.dedent(val[len("f(") : val.rindex(")")])
 
         val = self.align_strings(val, target_indent)
 
-        result = ""
+        result: List[str] = []
         if not inline_formatting:
             for comment in parameter.pre_comments:
-                result += f"{string_indent}{comment}\n"
-        result += val.strip("\n")
+                result.append(f"{string_indent}{comment}\n")
+        result.append(val.strip("\n"))
         if param_list:
-            result += ","
+            result.append(",")
         post_comment_iter = iter(parameter.post_comments)
         if parameter._has_inline_comment:
-            result += f"{COMMENT_SPACING}{next(post_comment_iter)}"
-        result += "\n"
+            result.append(f"{COMMENT_SPACING}{next(post_comment_iter)}")
+        result.append("\n")
         for comment in post_comment_iter:
-            result += f"{string_indent}{comment}\n"
-        return result
+            result.append(f"{string_indent}{comment}\n")
+        return "".join(result)
 
     def format_params(self, parameters: ParameterSyntax) -> str:
         target_indent = parameters.target_indent
-        used_indent = TAB * (target_indent - 1)
+        used_indent = indent_str(target_indent - 1)
 
-        p_class = parameters.__class__
-        param_list = issubclass(p_class, ParamList)
-        inline_fmting = False
-        if p_class is InlineSingleParam:
-            inline_fmting = True
+        param_list = parameters.param_list
+        inline_fmting = parameters.inline_formatting
 
-        result = f"{used_indent}{parameters.keyword_name}:"
+        result: List[str] = [f"{used_indent}{parameters.keyword_name}:"]
         if inline_fmting:
-            result += " "
+            result.append(" ")
             prepended_comments = ""
             if parameters.comment != "":
                 prepended_comments += f"{used_indent}{parameters.comment.lstrip()}\n"
@@ -283,15 +314,17 @@ class Formatter(Parser):
                 prepended_comments += f"{used_indent}{comment}\n"
             if prepended_comments != "":
                 Warnings.comment_relocation(parameters.keyword_name, param.line_nb)
-            result = f"{prepended_comments}{result}"
+            result.insert(0, prepended_comments)
         else:
-            result += f"{parameters.comment}\n"
+            result.append(f"{parameters.comment}\n")
         for param in parameters.all_params:
-            result += self.format_param(param, target_indent, inline_fmting, param_list)
+            result.append(
+                self.format_param(param, target_indent, inline_fmting, param_list)
+            )
         num_c = len(param.post_comments)
         if num_c > 1 or (not param._has_inline_comment and num_c == 1):
             Warnings.block_comment_below(parameters.keyword_name, param.line_nb)
-        return result
+        return "".join(result)
 
     def add_newlines(
         self,
@@ -299,50 +332,59 @@ class Formatter(Parser):
         formatted_string: str = "",
         final_flush: bool = False,
         in_global_context: bool = False,
-        context: Syntax = None,
-    ):
+        context: Optional[ParameterSyntax] = None,
+    ) -> None:
         """
         Top-level (indent of 0) rules and python code get two newlines separation
         Indented rules/pycode get one newline separation
         Comments immediately preceding rules/pycode get newlined with them
         """
+        # Scan the trailing comment lines back from the end of the string
         comment_matches = 0
-        comment_break = 1
-        all_lines = formatted_string.splitlines()
-        if len(all_lines) > 0:
-            for line in reversed(all_lines):
-                if not comment_start(line):
-                    break
-                comment_matches += 1
-            comment_break = len(all_lines) - comment_matches
-
-        have_only_comment_lines = comment_break == 0
+        comments_start = len(formatted_string)
+        body_end = comments_start
+        if formatted_string.endswith("\n"):
+            body_end -= 1
+        line_end = body_end
+        while formatted_string != "":
+            line_start = formatted_string.rfind("\n", 0, line_end) + 1
+            if not comment_start(formatted_string[line_start:line_end]):
+                break
+            comment_matches += 1
+            comments_start = line_start
+            if line_start == 0:
+                break
+            line_end = line_start - 1
+
+        have_only_comment_lines = comment_matches > 0 and comments_start == 0
         if not have_only_comment_lines or final_flush:
             collate_same_singleparamkeyword = (
                 context is not None
                 and context.keyword_name == self.last_recognised_keyword
-                and issubclass(context.__class__, SingleParam)
+                and context.single_param
             )
             if not self.no_formatting_yet and not collate_same_singleparamkeyword:
                 if cur_indent == 0:
-                    self.result += "\n\n"
+                    self.result.write("\n\n")
                 elif in_global_context:
-                    self.result += "\n"
+                    self.result.write("\n")
         if in_global_context:  # Deal with comments
             if self.lagging_comments != "":
-                self.result += self.lagging_comments
+                self.result.write(self.lagging_comments)
                 self.lagging_comments = ""
 
-            if len(all_lines) > 0:
+            if formatted_string != "":
                 if not have_only_comment_lines:
-                    self.result += "\n".join(all_lines[:comment_break]).rstrip() + "\n"
+                    self.result.write(formatted_string[:comments_start].rstrip() + "\n")
                 if comment_matches > 0:
-                    self.lagging_comments = "\n".join(all_lines[comment_break:]) + "\n"
+                    self.lagging_comments = (
+                        formatted_string[comments_start:body_end] + "\n"
+                    )
                     if final_flush:
-                        self.result += self.lagging_comments
+                        self.result.write(self.lagging_comments)
         else:
-            self.result += formatted_string
+            self.result.write(formatted_string)
 
         if self.no_formatting_yet:
-            if comment_break > 0:
+            if not have_only_comment_lines:
                 self.no_formatting_yet = False
@@ -1,5 +1,5 @@
 import logging
-from typing import Optional
+from typing import List, Optional
 
 
 class LogConfig:
@@ -27,6 +27,24 @@ class LogConfig:
             )
 
 
+class WarningRecorder(logging.Handler):
+    """Records the warnings logged by snakefmt while used as a context manager"""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+    def __enter__(self) -> "WarningRecorder":
+        LogConfig.get_logger().addHandler(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        LogConfig.get_logger().removeHandler(self)
+
+
 PEP8_BLOCK_COMMENTS = """PEP8 recommends block comments appear before what they describe
 (see https://www.python.org/dev/peps/pep-0008/#id30)"""
 
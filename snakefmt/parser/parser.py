@@ -129,13 +129,13 @@ class Parser(ABC):
         """Processes the text in :self.buffer:"""
 
     @abstractmethod
-    def process_keyword_context(self, in_global_context: bool):
+    def process_keyword_context(self, in_global_context: bool) -> None:
         """Initialises parsing a keyword context, eg a 'rule:'"""
 
     @abstractmethod
     def process_keyword_param(
         self, param_context: ParameterSyntax, in_global_context: bool
-    ):
+    ) -> None:
         """Initialises parsing a keyword parameter, eg a 'input:'"""
 
     def process_keyword(
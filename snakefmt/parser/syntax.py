@@ -353,6 +353,11 @@ class KeywordSyntax(Syntax):
 class ParameterSyntax(Syntax):
     """Parses snakemake keywords that do not accept other keywords, eg 'input'"""
 
+    # Formatting properties of each parameter syntax, set by the subclasses
+    single_param: bool = False
+    param_list: bool = False
+    inline_formatting: bool = False
+
     def __init__(
         self,
         keyword_name: str,
@@ -474,6 +479,8 @@ class ParameterSyntax(Syntax):
 
 # ___Parameter Syntax Validators___#
 class SingleParam(ParameterSyntax):
+    single_param = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -494,11 +501,15 @@ class SingleParam(ParameterSyntax):
 
 
 class ParamList(ParameterSyntax):
+    param_list = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
 
 class InlineSingleParam(SingleParam):
+    inline_formatting = True
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
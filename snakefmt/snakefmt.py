@@ -10,10 +10,11 @@ from black import get_gitignore
 from pathspec import PathSpec
 
 from snakefmt import DEFAULT_LINE_LENGTH, __version__
-from snakefmt.config import inject_snakefmt_config
+from snakefmt.cache import Cache, compute_key
+from snakefmt.config import inject_snakefmt_config, make_black_mode
 from snakefmt.diff import Diff, ExitCode
 from snakefmt.formatter import Formatter
-from snakefmt.logging import LogConfig
+from snakefmt.logging import LogConfig, WarningRecorder
 from snakefmt.parser.parser import Snakefile
 
 sys.tracebacklimit = 0  # Disable exceptions tracebacks
@@ -229,6 +230,7 @@ def main(
             logger.warning(f"ignoring invalid path: {path}")
 
     differ = Diff(compact=compact_diff)
+    cache = Cache()
     files_changed, files_unchanged = 0, 0
     files_with_errors = 0
     for path in files_to_format:
@@ -247,11 +249,25 @@ def main(
         if not path_is_stdin:
             LogConfig.switch(path)
         try:
-            snakefile = Snakefile(StringIO(original_content))
-            formatter = Formatter(
-                snakefile, line_length=line_length, black_config_file=config
-            )
-            formatted_content = formatter.get_formatted()
+            cache_entry = None
+            if not path_is_stdin:
+                black_mode = make_black_mode(config, line_length)
+                cache_key = compute_key(original_content, black_mode)
+                cache_entry = cache.get(path, cache_key)
+            if cache_entry is None:
+                snakefile = Snakefile(StringIO(original_content))
+                with WarningRecorder() as recorder:
+                    formatter = Formatter(
+                        snakefile, line_length=line_length, black_config_file=config
+                    )
+                formatted_content = formatter.get_formatted()
+                if not path_is_stdin:
+                    cache.put(path, cache_key, formatted_content, recorder.messages)
+            else:
+                logger.debug("Formatted content found in cache")
+                for warning in cache_entry.warnings:
+                    logger.warning(warning)
+                formatted_content = cache_entry.formatted
         except Exception as error:
             if check:
                 logger.error(f"{error.__class__.__name__}: {error}")
@@ -284,6 +300,8 @@ def main(
                     with path.open("w") as out_handle:
                         out_handle.write(formatted_content)
 
+    cache.write()
+
     if check:
         if files_unchanged == len(files_to_format):
             logger.info(f"All {len(files_to_format)} file(s) would be left unchanged 🎉")
@@ -1,6 +1,18 @@
+from pathlib import Path
+
 import pytest
 from click.testing import CliRunner
 
+from snakefmt.cache import CACHE_DIR_ENV_VAR
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch) -> Path:
+    """Keeps the formatting cache of each test isolated from the user's"""
+    path = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv(CACHE_DIR_ENV_VAR, str(path))
+    return path
+
 
 @pytest.fixture
 def cli_runner() -> CliRunner:
@@ -0,0 +1,126 @@
+from unittest import mock
+
+import black
+
+from snakefmt import __version__
+from snakefmt.cache import CACHE_FILE_NAME, Cache, compute_key, get_cache_dir
+from snakefmt.diff import ExitCode
+from snakefmt.formatter import TAB
+from snakefmt.snakefmt import main
+
+
+class TestComputeKey:
+    def test_same_inputs_same_key(self):
+        mode = black.FileMode(line_length=88)
+        assert compute_key("a = 1\n", mode) == compute_key("a = 1\n", mode)
+
+    def test_different_content_different_key(self):
+        mode = black.FileMode(line_length=88)
+        assert compute_key("a = 1\n", mode) != compute_key("a = 2\n", mode)
+
+    def test_different_mode_different_key(self):
+        content = "a = 1\n"
+        assert compute_key(content, black.FileMode(line_length=88)) != compute_key(
+            content, black.FileMode(line_length=80)
+        )
+
+    def test_different_black_version_different_key(self):
+        mode = black.FileMode(line_length=88)
+        key = compute_key("a = 1\n", mode)
+        with mock.patch("snakefmt.cache.black.__version__", "0.0.0"):
+            assert compute_key("a = 1\n", mode) != key
+
+
+class TestCache:
+    def test_cache_dir_is_versioned(self, cache_dir):
+        assert get_cache_dir() == cache_dir / __version__
+
+    def test_missing_cache_file_is_empty(self, tmp_path):
+        cache = Cache(tmp_path / CACHE_FILE_NAME)
+        assert cache.get("Snakefile", "key") is None
+
+    def test_written_entries_are_read_back(self, tmp_path):
+        cache_file = tmp_path / "subdir" / CACHE_FILE_NAME
+        cache = Cache(cache_file)
+        cache.put("Snakefile", "key", "formatted")
+        cache.write()
+
+        entry = Cache(cache_file).get("Snakefile", "key")
+        assert entry.formatted == "formatted"
+        assert entry.warnings == ()
+
+    def test_entry_with_other_key_is_a_miss(self, tmp_path):
+        cache = Cache(tmp_path / CACHE_FILE_NAME)
+        cache.put("Snakefile", "key", "formatted")
+
+        assert cache.get("Snakefile", "other_key") is None
+        assert cache.get("other/Snakefile", "key") is None
+
+    def test_one_entry_kept_per_path(self, tmp_path):
+        cache = Cache(tmp_path / CACHE_FILE_NAME)
+        for i in range(10):
+            cache.put(tmp_path / "Snakefile", f"key{i}", f"formatted{i}")
+        cache.put(tmp_path / "other.smk", "key", "formatted")
+
+        assert len(cache.entries) == 2
+        assert cache.get(tmp_path / "Snakefile", "key9").formatted == "formatted9"
+        assert cache.get(tmp_path / "Snakefile", "key0") is None
+
+    def test_corrupt_cache_file_is_empty(self, tmp_path):
+        cache_file = tmp_path / CACHE_FILE_NAME
+        cache_file.write_text("not a pickle")
+
+        assert Cache(cache_file).get("Snakefile", "key") is None
+
+
+class TestCLICache:
+    def test_cached_file_is_not_formatted_again(self, cli_runner, tmp_path):
+        content = 'include:"a"\n'
+        expected = 'include: "a"\n'
+        file = tmp_path / "Snakefile"
+        file.write_text(content)
+        cli_runner.invoke(main, [str(file)])
+        assert file.read_text() == expected
+
+        file.write_text(content)
+        with mock.patch("snakefmt.snakefmt.Formatter") as mock_formatter:
+            cli_runner.invoke(main, [str(file)])
+            mock_formatter.assert_not_called()
+        assert file.read_text() == expected
+
+    def test_errors_are_not_cached(self, cli_runner, tmp_path):
+        file = tmp_path / "Snakefile"
+        file.write_text("rule a:\n\tcontainer: a = 'sing.img'\n")
+        params = ["--check", str(file)]
+
+        assert cli_runner.invoke(main, params).exit_code == ExitCode.ERROR.value
+        assert cli_runner.invoke(main, params).exit_code == ExitCode.ERROR.value
+
+    def test_edited_file_replaces_its_cache_entry(self, cli_runner, tmp_path):
+        file = tmp_path / "Snakefile"
+        for i in range(5):
+            file.write_text(f'include:"{i}"\n')
+            cli_runner.invoke(main, [str(file)])
+            assert file.read_text() == f'include: "{i}"\n'
+
+        assert len(Cache().entries) == 1
+
+    def test_stdin_is_not_cached(self, cli_runner):
+        cli_runner.invoke(main, ["-"], input='include:"a"\n')
+
+        assert len(Cache().entries) == 0
+
+    def test_warnings_are_replayed_on_cache_hit(self, cli_runner, tmp_path):
+        file = tmp_path / "Snakefile"
+        file.write_text("rule a:\n" f"{TAB * 1}threads: # c\n" f"{TAB * 2}1\n")
+        params = ["--check", str(file)]
+
+        first = cli_runner.invoke(main, params)
+        assert "comments relocated" in first.stderr
+        assert len(Cache().entries) == 1
+
+        with mock.patch("snakefmt.snakefmt.Formatter") as mock_formatter:
+            second = cli_runner.invoke(main, params)
+            mock_formatter.assert_not_called()
+        assert "comments relocated" in second.stderr
+        assert second.exit_code == first.exit_code
@@ -1,3 +1,5 @@
+import os
+import sys
 from pathlib import Path
 from unittest import mock
 
@@ -9,6 +11,7 @@ from snakefmt import DEFAULT_LINE_LENGTH
 from snakefmt.config import (
     find_pyproject_toml,
     inject_snakefmt_config,
+    make_black_mode,
     read_black_config,
     read_snakefmt_config,
 )
@@ -243,7 +246,10 @@ class TestReadBlackConfig:
         with pytest.raises(MalformattedToml) as error:
             read_black_config(path)
 
-        assert error.match("invalid character")
+        if sys.version_info >= (3, 11):
+            assert error.match("Invalid statement")
+        else:
+            assert error.match("invalid character")
 
     def test_skip_string_normalisation_handled_with_snakecase(self, tmp_path):
         formatter = setup_formatter("")
@@ -281,3 +287,37 @@ class TestReadBlackConfig:
 
         expected = black.FileMode(line_length=line_length, string_normalization=False)
         assert formatter.black_mode == expected
+
+
+class TestMakeBlackMode:
+    def test_config_parsed_once_for_identical_arguments(self, tmp_path):
+        path = tmp_path / "config.toml"
+        path.write_text("[tool.black]\nline_length = 9")
+        with mock.patch(
+            "snakefmt.config.read_black_config", wraps=read_black_config
+        ) as mock_m:
+            first = make_black_mode(path)
+            second = make_black_mode(str(path))
+            assert mock_m.call_count == 1
+
+        assert first == second == black.FileMode(line_length=9)
+        assert first is not second
+
+    def test_modified_config_is_reparsed(self, tmp_path):
+        path = tmp_path / "config.toml"
+        path.write_text("[tool.black]\nline_length = 9")
+        assert make_black_mode(path) == black.FileMode(line_length=9)
+
+        path.write_text("[tool.black]\nline_length = 10")
+        mtime = os.path.getmtime(path)
+        os.utime(path, (mtime + 1, mtime + 1))
+        assert make_black_mode(path) == black.FileMode(line_length=10)
+
+    def test_line_length_overrides_config(self, tmp_path):
+        path = tmp_path / "config.toml"
+        path.write_text("[tool.black]\nline_length = 9")
+
+        actual = make_black_mode(path, line_length=50)
+
+        assert actual == black.FileMode(line_length=50)
+        assert make_black_mode(path) == black.FileMode(line_length=9)
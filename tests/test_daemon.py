@@ -0,0 +1,109 @@
+import logging
+import threading
+from http.client import HTTPConnection
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from snakefmt import __version__
+from snakefmt.daemon import LINE_LENGTH_HEADER, VERSION_HEADER, make_server
+from snakefmt.formatter import TAB
+from snakefmt.logging import LogConfig
+
+
+@pytest.fixture
+def start_server():
+    """Starts servers on a free port, returning their URL"""
+    LogConfig.init(logging.INFO)
+    servers = []
+
+    def start(black_config=None) -> str:
+        server = make_server("localhost", 0, black_config)
+        servers.append(server)
+        thread = threading.Thread(
+            target=server.serve_forever, kwargs=dict(poll_interval=0.01), daemon=True
+        )
+        thread.start()
+        host, port = server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def server_url(start_server):
+    return start_server()
+
+
+def post(url: str, content: str, headers=None):
+    request = Request(url, data=content.encode("utf-8"), headers=headers or {})
+    return urlopen(request)
+
+
+class TestDaemon:
+    def test_unformatted_content_is_returned_formatted(self, server_url):
+        response = post(server_url, 'include:"a"')
+
+        assert response.status == 200
+        assert response.read().decode() == 'include: "a"\n'
+        assert response.headers[VERSION_HEADER] == __version__
+
+    def test_formatted_content_returns_no_content(self, server_url):
+        response = post(server_url, 'include: "a"\n')
+
+        assert response.status == 204
+        assert response.read() == b""
+
+    def test_invalid_snakefile_returns_bad_request(self, server_url):
+        with pytest.raises(HTTPError) as error:
+            post(server_url, "rule a:\n" f'{TAB * 1}container: a = "sing.img"\n')
+
+        assert error.value.code == 400
+        assert "InvalidParameter" in error.value.read().decode()
+
+    def test_line_length_header_is_used(self, server_url):
+        response = post(server_url, "x = [1, 2]\n", {LINE_LENGTH_HEADER: "5"})
+
+        assert response.status == 200
+        assert response.read().decode() == f"x = [\n{TAB * 1}1,\n{TAB * 1}2,\n]\n"
+
+    def test_invalid_line_length_header_returns_bad_request(self, server_url):
+        with pytest.raises(HTTPError) as error:
+            post(server_url, 'include: "a"\n', {LINE_LENGTH_HEADER: "foo"})
+
+        assert error.value.code == 400
+
+    def test_black_config_given_at_startup_is_used(self, start_server, tmp_path):
+        path = tmp_path / "pyproject.toml"
+        path.write_text("[tool.black]\nskip_string_normalization = true")
+        snakecode = "include: 'a'\n"
+
+        assert post(start_server(), snakecode).status == 200
+        assert post(start_server(black_config=str(path)), snakecode).status == 204
+
+    def test_black_config_cannot_be_chosen_by_client(self, server_url, tmp_path):
+        path = tmp_path / "pyproject.toml"
+        path.write_text("[tool.black]\nskip_string_normalization = true")
+
+        response = post(server_url, "include: 'a'\n", {"X-Black-Config": str(path)})
+
+        assert response.status == 200
+        assert response.read().decode() == 'include: "a"\n'
+
+    @pytest.mark.parametrize("content_length", ["foo", "-1"])
+    def test_invalid_content_length_header_returns_bad_request(
+        self, server_url, content_length
+    ):
+        connection = HTTPConnection(server_url[len("http://") :], timeout=5)
+        connection.putrequest("POST", "/")
+        connection.putheader("Content-Length", content_length)
+        connection.endheaders()
+        response = connection.getresponse()
+
+        assert response.status == 400
+        assert "Content-Length" in response.read().decode()
+        connection.close()
@@ -3,11 +3,14 @@
 The tests implicitly assume that the input syntax is correct ie that no parsing-related
 errors arise, as tested in test_parser.py.
 """
+import textwrap
 from io import StringIO
 from unittest import mock
 
+import black
 import pytest
 
+from snakefmt.formatter import dedent_lines
 from snakefmt.parser.grammar import SingleParam, SnakeGlobal
 from snakefmt.parser.syntax import COMMENT_SPACING, TAB
 from tests import Formatter, Snakefile, setup_formatter
@@ -257,6 +260,21 @@ class TestComplexParamFormatting:
 
 
 class TestSimplePythonFormatting:
+    def test_repeated_code_only_formatted_once_by_black(self):
+        snakecode = (
+            "rule a:\n"
+            f"{TAB * 1}input:\n"
+            f'{TAB * 2}"a",\n'
+            f"{TAB * 1}output:\n"
+            f'{TAB * 2}"a",\n'
+        )
+        with mock.patch(
+            "snakefmt.formatter.black.format_str", wraps=black.format_str
+        ) as mock_m:
+            formatter = setup_formatter(snakecode)
+            assert mock_m.call_count == 1
+        assert formatter.get_formatted() == snakecode
+
     @mock.patch(
         "snakefmt.formatter.Formatter.run_black_format_str", spec=True, return_value=""
     )
@@ -285,6 +303,19 @@ class TestSimplePythonFormatting:
         actual = formatter.get_formatted()
         assert actual == python_code
 
+    @pytest.mark.parametrize(
+        "python_code",
+        [
+            'x = """a\rb"""\n',
+            "# a\x0cb\nx = 1\n",
+            "x = 1  # a\x0cb\n",
+        ],
+    )
+    def test_non_newline_line_breaks_are_preserved(self, python_code):
+        """Only '\\n' separates lines: a '\\r' or '\\x0c' is kept as-is"""
+        formatter = setup_formatter(python_code)
+        assert formatter.get_formatted() == python_code
+
     def test_python_code_with_rawString(self):
         python_code = (
             "def get_read_group(wildcards):\n"
@@ -704,6 +735,23 @@ rule a:
         assert formatter.get_formatted() == expected
 
 
+class TestStringAlignment:
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "",
+            "  a\n",
+            '    """a\n      b\n    """',
+            "  a\n\n    b\n   \n",
+            "  a\n\tb\n",
+            "    a\n \n  b\n",
+            "  a\n        \n    b\n",
+        ],
+    )
+    def test_dedent_lines_matches_textwrap(self, text):
+        assert dedent_lines(text) == textwrap.dedent(text)
+
+
 class TestReformatting_SMK_BREAK:
     """
     Cases where snakemake v5.13.0 raises errors, but snakefmt reformats
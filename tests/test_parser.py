@@ -162,6 +162,22 @@ class TestParamSyntax:
             snake_code = f"envvars:\n" f'{TAB * 1}"VAR1",' f'{TAB * 1}var2 = "VAR2"'
             setup_formatter(snake_code)
 
+    @pytest.mark.parametrize(
+        "keyword,value",
+        [
+            ("input", "f(a=1, 2)"),
+            ("input", "f(**k, *a)"),
+            ("input", "f(x for x in y, 1)"),
+            ("input", "a=dict(b=1, 2)"),
+            ("input", f'"a", f(a=1,\n{TAB * 2}2)'),
+            ("params", 'k=f"{"'),
+        ],
+    )
+    def test_parameter_list_invalid_python_arguments_fail(self, keyword, value):
+        """Black's grammar accepts these, so they must be caught before it runs"""
+        with pytest.raises(InvalidParameterSyntax):
+            setup_formatter(f"rule a:\n{TAB * 1}{keyword}: {value}\n")
+
     def test_dictionary_unpacking_passes(self):
         snake_code = (
             f"rule a:\n"